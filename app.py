@@ -1,21 +1,26 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from assets import Assets
 
 db = SQLAlchemy()
 login_manager = LoginManager()
+assets = Assets()
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your_secret_key'
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///data.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['TEMPLATES_AUTO_RELOAD'] = True
+    if config:
+        app.config.update(config)
 
 
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    assets.init_app(app)
 
     from models import User
 
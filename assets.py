@@ -0,0 +1,207 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import click
+from flask import Blueprint, abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен — без него работаем только с gzip
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+# Файлы с хешем в имени никогда не меняются, поэтому кешируем их на год
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+COMPRESS_MIMETYPES = ('text/html', 'application/json')
+
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+
+def _accepts(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def _dist_dir(app):
+    # Относительный путь считаем от корня приложения, а не от текущего каталога
+    return os.path.join(app.root_path, app.config['ASSETS_DIST_DIR'])
+
+
+def _hashed_name(path, digest):
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.{digest}{ext}'
+
+
+def _write_atomic(path, data):
+    # Запись через временный файл, чтобы работающий сервер не отдал файл наполовину
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_assets(static_dir, dist_dir, min_size=0):
+    """Копирует файлы из static/ в dist_dir с хешем содержимого в имени,
+    рядом кладёт .gz/.br версии и manifest.json с исходными путями.
+
+    Файлы предыдущих сборок не удаляются: открытые в браузере страницы
+    и ещё не перечитавший манифест сервер продолжают на них ссылаться.
+    Устаревшие файлы убирает clean_assets."""
+    os.makedirs(dist_dir, exist_ok=True)
+    real_dist_dir = os.path.realpath(dist_dir)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        # Не обрабатываем результаты предыдущей сборки
+        dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(root, d)) != real_dist_dir]
+        for name in files:
+            src = os.path.join(root, name)
+            rel = os.path.relpath(src, static_dir).replace(os.sep, '/')
+            with open(src, 'rb') as f:
+                data = f.read()
+            hashed = _hashed_name(rel, hashlib.sha256(data).hexdigest()[:12])
+            dst = os.path.join(dist_dir, hashed)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            _write_atomic(dst, data)
+            if name.endswith(PRECOMPRESS_EXTENSIONS) and len(data) >= min_size:
+                _write_atomic(dst + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    _write_atomic(dst + '.br', brotli.compress(data, quality=11))
+            manifest[rel] = hashed
+
+    _write_atomic(
+        os.path.join(dist_dir, MANIFEST_NAME),
+        json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'),
+    )
+    return manifest
+
+
+def clean_assets(dist_dir, manifest, max_age):
+    """Удаляет файлы прошлых сборок, которых нет в manifest и которые
+    не перезаписывались дольше max_age секунд. Возвращает их пути."""
+    current = {MANIFEST_NAME}
+    for hashed in manifest.values():
+        current.update((hashed, hashed + '.gz', hashed + '.br'))
+    # Текущие файлы перезаписываются при каждой сборке, поэтому mtime
+    # старого файла — это время последней сборки, в которой он был актуален
+    deadline = time.time() - max_age
+
+    removed = []
+    for root, dirs, files in os.walk(dist_dir, topdown=False):
+        for name in files:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+            if rel not in current and os.path.getmtime(path) <= deadline:
+                os.remove(path)
+                removed.append(rel)
+        if root != dist_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+@assets_bp.route('/<path:filename>')
+def asset(filename):
+    dist_dir = _dist_dir(current_app)
+    if filename == MANIFEST_NAME or not os.path.isfile(os.path.join(dist_dir, filename)):
+        abort(404)
+
+    # Отдаём заранее сжатую версию, если клиент её поддерживает. Тип и имя
+    # файла в заголовках остаются от исходного файла, а не от .gz/.br
+    path = filename
+    encoding = None
+    for candidate, ext in (('br', '.br'), ('gzip', '.gz')):
+        if _accepts(candidate) and os.path.isfile(os.path.join(dist_dir, filename + ext)):
+            encoding = candidate
+            path = filename + ext
+            break
+
+    response = send_from_directory(dist_dir, path, download_name=os.path.basename(filename))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+class Assets:
+    def __init__(self, app=None):
+        self.manifest = {}
+        self._manifest_key = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ASSETS_DIST_DIR', os.path.join(app.root_path, 'dist'))
+        # Сколько секунд хранить файлы прошлых сборок (по умолчанию неделю)
+        app.config.setdefault('ASSETS_MAX_AGE', 7 * 24 * 60 * 60)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        # COMPRESS_LEVEL — уровень gzip (1–9), COMPRESS_BR_LEVEL — качество brotli (0–11)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 5)
+
+        app.register_blueprint(assets_bp)
+        app.add_template_global(self.asset_url)
+        app.after_request(self.compress_response)
+
+        @app.cli.command('build-assets')
+        @click.option('--clean', is_flag=True, help='Сразу удалить все файлы прошлых сборок.')
+        def build_assets_command(clean):
+            """Собрать хешированные и сжатые файлы из static/."""
+            dist_dir = _dist_dir(app)
+            manifest = build_assets(app.static_folder, dist_dir, app.config['COMPRESS_MIN_SIZE'])
+            click.echo(f'Собрано файлов: {len(manifest)}')
+            max_age = 0 if clean else app.config['ASSETS_MAX_AGE']
+            removed = clean_assets(dist_dir, manifest, max_age)
+            click.echo(f'Удалено устаревших файлов: {len(removed)}')
+
+    def get_manifest(self):
+        # Перечитываем манифест, если build-assets запускали после старта сервера
+        path = os.path.join(_dist_dir(current_app), MANIFEST_NAME)
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            key = None
+        if key != self._manifest_key:
+            if key is None:
+                self.manifest = {}
+            else:
+                with open(path, encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            self._manifest_key = key
+        return self.manifest
+
+    def asset_url(self, filename):
+        # Без сборки (например, при разработке) отдаём файл как обычную статику
+        hashed = self.get_manifest().get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('assets.asset', filename=hashed)
+
+    def compress_response(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESS_MIMETYPES
+            or response.cache_control.no_transform
+        ):
+            return response
+
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if brotli is not None and _accepts('br'):
+            quality = current_app.config['COMPRESS_BR_LEVEL']
+            response.set_data(brotli.compress(data, quality=quality))
+            response.headers['Content-Encoding'] = 'br'
+        elif _accepts('gzip'):
+            level = current_app.config['COMPRESS_LEVEL']
+            response.set_data(gzip.compress(data, compresslevel=level))
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
@@ -0,0 +1,209 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import assets
+from assets import IMMUTABLE_CACHE_CONTROL, MANIFEST_NAME, build_assets, clean_assets
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    static = tmp_path / 'static'
+    static.mkdir()
+    (static / 'style.css').write_text('body { color: black; }\n' * 100)
+    (static / 'small.css').write_text('a{}')
+    return static
+
+
+@pytest.fixture
+def built(app, static_dir):
+    return build_assets(str(static_dir), app.config['ASSETS_DIST_DIR'], min_size=100)
+
+
+def test_build_hashes_names_and_precompresses_large_files(app, built):
+    dist_dir = app.config['ASSETS_DIST_DIR']
+    assert set(built) == {'style.css', 'small.css'}
+    assert built['style.css'].startswith('style.')
+    assert built['style.css'] != 'style.css'
+    assert os.path.isfile(os.path.join(dist_dir, built['style.css']))
+    assert os.path.isfile(os.path.join(dist_dir, built['style.css'] + '.gz'))
+    assert not os.path.exists(os.path.join(dist_dir, built['small.css'] + '.gz'))
+    with open(os.path.join(dist_dir, MANIFEST_NAME)) as f:
+        assert json.load(f) == built
+
+
+def test_build_keeps_previous_versions(app, static_dir, built):
+    (static_dir / 'style.css').write_text('body { color: red; }\n' * 100)
+    rebuilt = build_assets(str(static_dir), app.config['ASSETS_DIST_DIR'])
+    assert rebuilt['style.css'] != built['style.css']
+    assert os.path.isfile(os.path.join(app.config['ASSETS_DIST_DIR'], built['style.css']))
+
+
+def test_clean_removes_only_expired_previous_versions(app, static_dir, built):
+    dist_dir = app.config['ASSETS_DIST_DIR']
+    old = os.path.join(dist_dir, built['style.css'])
+    (static_dir / 'style.css').write_text('body { color: red; }\n' * 100)
+    rebuilt = build_assets(str(static_dir), dist_dir, min_size=100)
+
+    assert clean_assets(dist_dir, rebuilt, max_age=3600) == []
+    assert os.path.isfile(old)
+
+    hour_ago = os.path.getmtime(old) - 3600
+    old_files = [name for name in os.listdir(dist_dir) if name.startswith(built['style.css'])]
+    for name in old_files:
+        os.utime(os.path.join(dist_dir, name), (hour_ago, hour_ago))
+    assert sorted(clean_assets(dist_dir, rebuilt, max_age=60)) == sorted(old_files)
+    assert not os.path.exists(old)
+    assert os.path.isfile(os.path.join(dist_dir, rebuilt['style.css']))
+    assert os.path.isfile(os.path.join(dist_dir, rebuilt['style.css'] + '.gz'))
+    assert os.path.isfile(os.path.join(dist_dir, rebuilt['small.css']))
+    assert os.path.isfile(os.path.join(dist_dir, MANIFEST_NAME))
+
+
+def test_build_command_clean(app, static_dir, built, monkeypatch):
+    dist_dir = app.config['ASSETS_DIST_DIR']
+    (static_dir / 'style.css').write_text('body { color: red; }\n' * 100)
+    monkeypatch.setattr(app, 'static_folder', str(static_dir))
+
+    result = app.test_cli_runner().invoke(args=['build-assets'])
+    assert result.exit_code == 0
+    assert os.path.isfile(os.path.join(dist_dir, built['style.css']))
+
+    result = app.test_cli_runner().invoke(args=['build-assets', '--clean'])
+    assert result.exit_code == 0
+    assert not os.path.exists(os.path.join(dist_dir, built['style.css']))
+
+
+def test_build_skips_dist_inside_static(static_dir):
+    dist_dir = str(static_dir / 'dist') + os.sep
+    build_assets(str(static_dir), dist_dir)
+    manifest = build_assets(str(static_dir), dist_dir)
+    assert set(manifest) == {'style.css', 'small.css'}
+
+
+def test_asset_served_gzipped_with_immutable_cache(client, built, static_dir):
+    response = client.get(f"/assets/{built['style.css']}", headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.mimetype == 'text/css'
+    assert '.gz' not in response.headers['Content-Disposition']
+    assert gzip.decompress(response.get_data()) == (static_dir / 'style.css').read_bytes()
+    response.close()
+
+
+def test_asset_served_plain_without_accept_encoding(client, built, static_dir):
+    response = client.get(f"/assets/{built['style.css']}")
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == (static_dir / 'style.css').read_bytes()
+    response.close()
+
+
+@pytest.mark.parametrize('path', [
+    f'/assets/{MANIFEST_NAME}',
+    '/assets/../static/style.css',
+    '/assets/..%2Fstatic%2Fstyle.css',
+    '/assets/missing.css',
+])
+def test_asset_not_found(client, built, path):
+    assert client.get(path).status_code == 404
+
+
+def test_small_html_not_compressed(app, client):
+    app.config['COMPRESS_MIN_SIZE'] = 10 ** 6
+    response = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert b'<html' in response.get_data()
+
+
+def test_large_html_gzipped(client):
+    response = client.get('/login', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert b'<html' in gzip.decompress(response.get_data())
+
+
+def test_html_not_compressed_without_accept_encoding(client):
+    response = client.get('/login')
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_asset_url_falls_back_to_static(client):
+    html = client.get('/login').get_data(as_text=True)
+    assert 'href="/static/style.css"' in html
+
+
+def test_asset_url_uses_manifest(app, client):
+    manifest = build_assets(app.static_folder, app.config['ASSETS_DIST_DIR'])
+    html = client.get('/login').get_data(as_text=True)
+    assert f'href="/assets/{manifest["style.css"]}"' in html
+
+
+def test_no_transform_response_not_compressed(app, client):
+    @app.route('/raw')
+    def raw():
+        return '<html>' + 'x' * 4096, 200, {'Cache-Control': 'no-transform'}
+
+    response = client.get('/raw', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_relative_dist_dir_resolved_from_app_root(app, client, tmp_path, monkeypatch):
+    app.config['ASSETS_DIST_DIR'] = os.path.relpath(tmp_path / 'distrel', app.root_path)
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+
+    result = app.test_cli_runner().invoke(args=['build-assets'])
+    assert result.exit_code == 0
+    assert os.path.isfile(tmp_path / 'distrel' / MANIFEST_NAME)
+
+    html = client.get('/login').get_data(as_text=True)
+    href = html.split('rel="stylesheet" href="')[1].split('"')[0]
+    assert href.startswith('/assets/style.')
+    response = client.get(href)
+    assert response.status_code == 200
+    response.close()
+
+
+def test_default_dist_dir_outside_static():
+    from app import create_app
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    dist_dir = os.path.realpath(app.config['ASSETS_DIST_DIR'])
+    static_dir = os.path.realpath(app.static_folder)
+    assert os.path.commonpath([dist_dir, static_dir]) != static_dir
+
+
+def test_precompressed_brotli_preferred(client, built, static_dir):
+    brotli = pytest.importorskip('brotli')
+    response = client.get(f"/assets/{built['style.css']}", headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.mimetype == 'text/css'
+    assert brotli.decompress(response.get_data()) == (static_dir / 'style.css').read_bytes()
+    response.close()
+
+
+def test_large_html_brotli_preferred(client):
+    brotli = pytest.importorskip('brotli')
+    response = client.get('/login', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert b'<html' in brotli.decompress(response.get_data())
+
+
+def test_brotli_missing_falls_back_to_gzip(app, client, static_dir, monkeypatch):
+    monkeypatch.setattr(assets, 'brotli', None)
+    manifest = build_assets(str(static_dir), app.config['ASSETS_DIST_DIR'])
+    assert not os.path.exists(os.path.join(app.config['ASSETS_DIST_DIR'], manifest['style.css'] + '.br'))
+
+    response = client.get(f"/assets/{manifest['style.css']}", headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    response.close()
+
+    response = client.get('/login', headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert b'<html' in gzip.decompress(response.get_data())